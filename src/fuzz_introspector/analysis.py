@@ -81,7 +81,10 @@ class IntrospectionProject():
             raise DataLoaderError("No fuzzer profiles")
 
         self.input_bugs = data_loader.try_load_input_bugs()
-        correlation_dict = utils.data_file_read_yaml(correlation_file)
+        if correlation_file and correlation_file.endswith('.json'):
+            correlation_dict = utils.data_file_read_json(correlation_file)
+        else:
+            correlation_dict = utils.data_file_read_yaml(correlation_file)
         if correlation_dict is not None and "pairings" in correlation_dict:
             for profile in self.profiles:
                 profile.correlate_executable_name(correlation_dict)
@@ -1145,8 +1148,8 @@ def _extract_test_information_cpp(report_dict, out_dir):
 
 def extract_tests_from_directories(directories, language, out_dir) -> Set[str]:
     """Extracts test files from a given collection of directory paths and also
-    copies them to the `constants.SAVED_SOURCE_FOLDER` folder with the same
-    absolute path appended."""
+    copies them to the `constants.SAVED_SOURCE_FOLDER` folder in `out_dir`
+    with the same absolute path appended, unless `out_dir` is empty."""
     all_files_in_subtree = set()
     for directory in directories:
         for root, _, files in os.walk(directory):
@@ -1250,6 +1253,8 @@ def extract_tests_from_directories(directories, language, out_dir) -> Set[str]:
     logger.info("All test files")
     for test_file in all_test_files:
         logger.info(test_file)
+        if not out_dir:
+            continue
         dst = os.path.join(out_dir,
                            constants.SAVED_SOURCE_FOLDER + '/' + test_file)
         os.makedirs(os.path.dirname(dst), exist_ok=True)
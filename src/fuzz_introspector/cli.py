@@ -299,7 +299,7 @@ def main() -> int:
     elif args.command == 'diff':
         return_code = commands.diff_two_reports(args.report1, args.report2)
     elif args.command == 'light':
-        return_code = commands.light_analysis(args)
+        return_code, _ = commands.light_analysis(args)
     elif args.command == 'full':
         return_code = commands.end_to_end(args)
     elif args.command == 'analyse':
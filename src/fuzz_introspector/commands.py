@@ -13,35 +13,54 @@
 # limitations under the License.
 """High-level routines and CLI entrypoints"""
 
+import hashlib
 import logging
 import os
 import json
+import tempfile
 import yaml
 import shutil
-from typing import Optional, Dict, Any, Tuple
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, BinaryIO, Iterable, Tuple
 
 from fuzz_introspector import analysis
 from fuzz_introspector import constants
-from fuzz_introspector import diff_report
-from fuzz_introspector import html_report
 from fuzz_introspector import utils
 
 from fuzz_introspector.exceptions import DataLoaderError
-from fuzz_introspector.frontends import oss_fuzz
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
 
 logger = logging.getLogger(name=__name__)
 
+FRONTEND_CACHE_COMPLETE_MARKER = '.frontend-cache-complete'
+
+# Languages analysed by the backend as 'c-cpp'.
+C_CPP_LANGUAGES = frozenset(
+    {constants.LANGUAGES.C, constants.LANGUAGES.CPP, 'cpp', 'c-cpp'})
+
 
 def diff_two_reports(report1: str, report2: str) -> int:
+    from fuzz_introspector import diff_report
+
     diff_report.diff_two_reports(report1, report2)
     return constants.APP_EXIT_SUCCESS
 
 
 def correlate_binaries_to_logs(binaries_dir: str) -> int:
     pairings = utils.scan_executables_for_fuzz_introspector_logs(binaries_dir)
-    logger.info("Pairings: %s", str(pairings))
+    logger.info("Pairings: %s", pairings)
     with open("exe_to_fuzz_introspector_logs.yaml", "w+") as etf:
-        etf.write(yaml.dump({'pairings': pairings}))
+        # Prefer the libyaml backed emitter over the pure Python one.
+        dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+        yaml.dump({'pairings': pairings}, etf, Dumper=dumper)
+    # Also write the pairings as json, which is faster to load back.
+    with open("exe_to_fuzz_introspector_logs.json", "wb+") as etf:
+        etf.write(_json_encode({'pairings': pairings}))
     return constants.APP_EXIT_SUCCESS
 
 
@@ -60,8 +79,7 @@ def end_to_end(args) -> int:
     else:
         out_dir = os.getcwd()
 
-    if not os.path.exists(out_dir):
-        os.mkdir(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
 
     if args.language == constants.LANGUAGES.JAVA:
         entrypoint = 'fuzzerTestOneInput'
@@ -81,6 +99,23 @@ def end_to_end(args) -> int:
     return exit_code
 
 
+def _find_correlation_file(out_dir: str) -> str:
+    """Returns the correlation file in `out_dir`, or an empty string if
+    there is none. The json file is preferred as it is faster to load, but
+    only if it is not older than the yaml file, which the frontend may
+    have rewritten since."""
+    json_file = os.path.join(out_dir, 'exe_to_fuzz_introspector_logs.json')
+    yaml_file = os.path.join(out_dir, 'exe_to_fuzz_introspector_logs.yaml')
+    if os.path.isfile(json_file):
+        if not os.path.isfile(yaml_file) or (os.path.getmtime(json_file)
+                                             >= os.path.getmtime(yaml_file)):
+            return json_file
+        logger.info('Ignoring %s as it is older than %s', json_file, yaml_file)
+    if os.path.isfile(yaml_file):
+        return yaml_file
+    return ''
+
+
 def analyse_end_to_end(arg_language,
                        target_dir,
                        entrypoint='',
@@ -91,6 +126,8 @@ def analyse_end_to_end(arg_language,
                        dump_files=True,
                        harness_file:str = ''):
     """End to end analysis helper function."""
+    from fuzz_introspector.frontends import oss_fuzz
+
     return_values = {}
     project, harness_lists = oss_fuzz.analyse_folder(language=arg_language,
                                                      directory=target_dir,
@@ -105,15 +142,12 @@ def analyse_end_to_end(arg_language,
         logger.info('No harness list at place')
 
     return_values['light-project'] = project
-    if 'c' in arg_language:
+    if arg_language in C_CPP_LANGUAGES:
         language = 'c-cpp'
     else:
         language = arg_language
 
-    correlation_file = os.path.join(out_dir,
-                                    'exe_to_fuzz_introspector_logs.yaml')
-    if not os.path.isfile(correlation_file):
-        correlation_file = ''
+    correlation_file = _find_correlation_file(out_dir)
 
     try:
         exit_code, return_values2 = run_analysis_on_dir(
@@ -150,20 +184,26 @@ def run_analysis_on_dir(target_folder: str,
     """Runs Fuzz Introspector analysis from based on the results
     from a frontend run. The primary task is to aggregate the data
     and generate a HTML report."""
+    from fuzz_introspector import html_report
+
     logger.info('Running analysis')
     constants.should_dump_files = dump_files
 
     if enable_all_analyses:
-        for analysis_interface in analysis.get_all_analyses():
-            if analysis_interface.get_name() not in analyses_to_run:
-                analyses_to_run.append(analysis_interface.get_name())
+        # Merge in all analyses, keeping order and dropping duplicates.
+        all_analysis_names = [
+            analysis_interface.get_name()
+            for analysis_interface in analysis.get_all_analyses()
+        ]
+        analyses_to_run = list(
+            dict.fromkeys(analyses_to_run + all_analysis_names))
 
     introspection_proj = analysis.IntrospectionProject(language, target_folder,
                                                        coverage_url)
     introspection_proj.load_data_files(parallelise, correlation_file, out_dir,
                                        harness_lists)
 
-    logger.info("Analyses to run: %s", str(analyses_to_run))
+    logger.info("Analyses to run: %s", analyses_to_run)
     logger.info("[+] Creating HTML report")
     if output_json is None:
         output_json = []
@@ -179,38 +219,319 @@ def run_analysis_on_dir(target_folder: str,
     return constants.APP_EXIT_SUCCESS, return_values
 
 
-def light_analysis(args) -> int:
+def _json_encode(obj: Any) -> bytes:
+    """Encodes `obj` as compact JSON, with sets encoded as arrays. orjson is
+    used if it is available as it is considerably faster than the json
+    module, which remains the fallback for strings orjson rejects, such as
+    file names that are not valid UTF-8."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=list)
+        except TypeError:
+            # orjson.JSONEncodeError is a TypeError.
+            pass
+    return json.dumps(obj, separators=(',', ':'), default=list).encode()
+
+
+def _dump_iter(items: Iterable[Any], fp: BinaryIO) -> None:
+    """Writes `items` to `fp` as a JSON array. With orjson the array is
+    encoded in a single call, otherwise it is written one element at a time
+    so no intermediate list or document string is built."""
+    if orjson is not None:
+        fp.write(_json_encode(items))
+        return
+
+    fp.write(b'[')
+    first = True
+    for item in items:
+        if not first:
+            fp.write(b',')
+        first = False
+        fp.write(_json_encode(item))
+    fp.write(b']')
+
+
+def _fast_clone(src: str, dst: str) -> bool:
+    """Clones `src` to `dst` by hardlinking it if possible, and otherwise by
+    letting the kernel copy it (which may reflink). Returns False if
+    neither is possible, leaving the copying to the caller."""
+    try:
+        os.link(src, dst)
+        return True
+    except FileExistsError:
+        # Remove leftovers from a previous run, as these may be links to
+        # `src` and writing through them would truncate the original.
+        os.remove(dst)
+        try:
+            os.link(src, dst)
+            return True
+        except OSError:
+            pass
+    except OSError:
+        pass
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as src_f, open(dst, 'wb') as dst_f:
+                remaining = os.fstat(src_f.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src_f.fileno(), dst_f.fileno(),
+                                                remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return True
+        except OSError:
+            pass
+        # Do not leave a truncated copy behind for the caller's fallback.
+        try:
+            os.remove(dst)
+        except OSError:
+            pass
+
+    return False
+
+
+def _copy_files_with_tar(files: list[str], dst_root: str) -> bool:
+    """Copies the absolute paths in `files` to the same paths under
+    `dst_root` through a single tar pipe, which is cheaper than copying
+    many small files one by one. Returns False if tar is not usable."""
+    if not shutil.which('tar'):
+        return False
+    file_list = b''.join(os.fsencode(f.lstrip('/')) + b'\0' for f in files)
+
+    try:
+        create_proc = subprocess.Popen(
+            # Archive what symlinks point to, as the other copy paths do.
+            [
+                'tar', '-C', '/', '--dereference', '--null', '-T', '-', '-cf',
+                '-'
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL)
+    except OSError:
+        return False
+    try:
+        extract_proc = subprocess.Popen(['tar', '-C', dst_root, '-xf', '-'],
+                                        stdin=create_proc.stdout,
+                                        stderr=subprocess.DEVNULL)
+    except OSError:
+        create_proc.terminate()
+        create_proc.communicate()
+        return False
+
+    # Let tar see end of file on its output if the extracting side exits.
+    if create_proc.stdout:
+        create_proc.stdout.close()
+    try:
+        if create_proc.stdin:
+            create_proc.stdin.write(file_list)
+            create_proc.stdin.close()
+    except OSError:
+        # Do not leave either tar running behind the caller's fallback.
+        try:
+            if create_proc.stdin:
+                create_proc.stdin.close()
+        except OSError:
+            pass
+        for proc in (create_proc, extract_proc):
+            proc.terminate()
+            proc.wait()
+        return False
+    return create_proc.wait() == 0 and extract_proc.wait() == 0
+
+
+def light_analysis(args,
+                   dump_files: bool = True) -> Tuple[int, Dict[str, Any]]:
     """Performs a light analysis, without any data from the frontends, so
-    no compilation is needed for this analysis."""
+    no compilation is needed for this analysis. The results are written to
+    disk only if `dump_files` is set, and are returned either way."""
     src_dir = os.getenv('SRC', '/src/')
     inspector_dir = os.path.join(src_dir, 'inspector')
     light_dir = os.path.join(inspector_dir, 'light')
 
-    if not os.path.isdir(light_dir):
+    if dump_files:
         os.makedirs(light_dir, exist_ok=True)
 
-    all_tests = analysis.extract_tests_from_directories({src_dir},
-                                                        args.language,
-                                                        inspector_dir)
-
-    with open(os.path.join(light_dir, 'all_tests.json'), 'w') as f:
-        f.write(json.dumps(list(all_tests)))
+    # Test files are only saved in the inspector directory when dumping.
+    all_tests = analysis.extract_tests_from_directories(
+        {src_dir}, args.language, inspector_dir if dump_files else '')
+    if dump_files:
+        with open(os.path.join(light_dir, 'all_tests.json'), 'wb') as f:
+            _dump_iter(all_tests, f)
 
     pairs = analysis.light_correlate_source_to_executable(args.language)
-    with open(os.path.join(light_dir, 'all_pairs.json'), 'w') as f:
-        f.write(json.dumps(list(pairs)))
+    if dump_files:
+        with open(os.path.join(light_dir, 'all_pairs.json'), 'wb') as f:
+            _dump_iter(pairs, f)
 
     all_source_files = analysis.extract_all_sources(args.language)
-    light_out_src = os.path.join(light_dir, 'source_files')
+    if dump_files:
+        light_out_src = os.path.join(light_dir, 'source_files')
+
+        # Create each destination directory once, then clone the files
+        # concurrently as the cloning is bound by I/O rather than CPU.
+        dst_dirs = {
+            os.path.dirname(light_out_src + '/' + source_file)
+            for source_file in all_source_files
+        }
+        for dst_dir in dst_dirs:
+            os.makedirs(dst_dir, exist_ok=True)
+
+        max_workers = min(32, (os.cpu_count() or 4) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            cloned = list(
+                executor.map(
+                    lambda source_file: _fast_clone(
+                        source_file, light_out_src + '/' + source_file),
+                    all_source_files))
+
+        # Copy the files that could not be cloned, e.g. as the output is on
+        # another file system, in one batch.
+        files_to_copy = [
+            source_file
+            for source_file, is_cloned in zip(all_source_files, cloned)
+            if not is_cloned
+        ]
+        if files_to_copy and not _copy_files_with_tar(files_to_copy,
+                                                      light_out_src):
+            for source_file in files_to_copy:
+                shutil.copy(source_file, light_out_src + '/' + source_file)
+        with open(os.path.join(light_dir, 'all_files.json'), 'wb') as f:
+            _dump_iter(all_source_files, f)
+
+    return_values = {
+        'test-files': all_tests,
+        'all-pairs': pairs,
+        'all-files': all_source_files
+    }
+    return constants.APP_EXIT_SUCCESS, return_values
 
-    for source_file in all_source_files:
-        dst = light_out_src + '/' + source_file
-        os.makedirs(os.path.dirname(dst), exist_ok=True)
-        shutil.copy(source_file, dst)
-    with open(os.path.join(light_dir, 'all_files.json'), 'w') as f:
-        f.write(json.dumps(list(all_source_files)))
 
-    return 0
+def _is_same_or_subdir(path: str, directory: str) -> bool:
+    """Returns whether `path` is `directory` or lies inside it."""
+    path = os.path.abspath(path)
+    directory = os.path.abspath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+
+def _digest_tree(digest, directory: str, dirs_to_skip: list[str]) -> None:
+    """Adds the path, modification time and size of each file in
+    `directory` to `digest`, leaving out anything in `dirs_to_skip`."""
+    dirs_to_skip = [os.path.abspath(d) for d in dirs_to_skip]
+    dirs_to_visit = [directory]
+    while dirs_to_visit:
+        dirpath = dirs_to_visit.pop()
+        if os.path.abspath(dirpath) in dirs_to_skip:
+            continue
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs_to_visit.append(entry.path)
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            digest.update(
+                f'{entry.path}\0{stat.st_mtime_ns}\0{stat.st_size}\n'.encode())
+
+
+def _get_frontend_cache_key(language: str, target_dir: str, entrypoint: str,
+                            dirs_to_skip: list[str]) -> str:
+    """Returns a key identifying the frontend output for the given inputs.
+    The frontend sources are part of the key, so that the cache is
+    invalidated when the frontends change, as are the textcov reports the
+    frontend pairs harnesses with."""
+    from fuzz_introspector.frontends import oss_fuzz
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f'{language}\0{entrypoint}\n'.encode())
+    _digest_tree(digest, os.path.dirname(oss_fuzz.__file__), dirs_to_skip)
+    _digest_tree(digest, target_dir, dirs_to_skip)
+
+    oss_fuzz_out = os.environ.get('OUT', '')
+    digest.update(f'{oss_fuzz_out}\n'.encode())
+    if oss_fuzz_out:
+        _digest_tree(digest, os.path.join(oss_fuzz_out, 'textcov_reports'),
+                     dirs_to_skip)
+    return digest.hexdigest()
+
+
+def _analyse_folder_with_cache(language: str, target_dir: str, entrypoint: str,
+                               out_dir: str) -> None:
+    """Runs the frontend on `target_dir` writing the output to `out_dir`.
+    If FI_FRONTEND_CACHE_DIR is set, the output of a previous run on an
+    unchanged tree is reused from there."""
+    from fuzz_introspector.frontends import oss_fuzz
+
+    cache_dir = os.environ.get('FI_FRONTEND_CACHE_DIR', '')
+    if cache_dir:
+        cache_dir = os.path.abspath(cache_dir)
+        if _is_same_or_subdir(target_dir, out_dir):
+            # The output would be part of the digest of the target tree,
+            # and skipping it would skip the whole tree.
+            logger.info('Not caching frontend output as %s contains %s',
+                        out_dir, target_dir)
+            cache_dir = ''
+        else:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+            except OSError:
+                logger.info('Could not create frontend cache at %s', cache_dir)
+                cache_dir = ''
+
+    if not cache_dir:
+        oss_fuzz.analyse_folder(language=language,
+                                directory=target_dir,
+                                entrypoint=entrypoint,
+                                out=out_dir)
+        return
+
+    cache_entry = os.path.join(
+        cache_dir,
+        _get_frontend_cache_key(language, target_dir, entrypoint,
+                                [cache_dir, out_dir]))
+    if os.path.isfile(os.path.join(cache_entry,
+                                   FRONTEND_CACHE_COMPLETE_MARKER)):
+        logger.info('Using cached frontend output from %s', cache_entry)
+    else:
+        # Run the frontend in a staging directory which is moved in place
+        # once complete, so partial output is never picked up.
+        staging_dir = tempfile.mkdtemp(dir=cache_dir)
+        try:
+            oss_fuzz.analyse_folder(language=language,
+                                    directory=target_dir,
+                                    entrypoint=entrypoint,
+                                    out=staging_dir)
+            with open(
+                    os.path.join(staging_dir, FRONTEND_CACHE_COMPLETE_MARKER),
+                    'w'):
+                pass
+        except BaseException:
+            # Do not leave a partial output behind in the cache.
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        shutil.rmtree(cache_entry, ignore_errors=True)
+        try:
+            os.rename(staging_dir, cache_entry)
+        except OSError:
+            # Another run populated the entry concurrently.
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            if not os.path.isdir(cache_entry):
+                raise
+
+    shutil.copytree(
+        cache_entry,
+        out_dir,
+        dirs_exist_ok=True,
+        ignore=shutil.ignore_patterns(FRONTEND_CACHE_COMPLETE_MARKER))
 
 
 def analyse(args) -> int:
@@ -238,8 +559,7 @@ def analyse(args) -> int:
     else:
         out_dir = os.getcwd()
 
-    if not os.path.exists(out_dir):
-        os.mkdir(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
 
     # Fix entrypoint default for languages
     if args.language == constants.LANGUAGES.JAVA:
@@ -248,12 +568,10 @@ def analyse(args) -> int:
         entrypoint = 'LLVMFuzzerTestOneInput'
 
     # Run the frontend
-    oss_fuzz.analyse_folder(language=args.language,
-                            directory=args.target_dir,
-                            entrypoint=entrypoint,
-                            out=out_dir)
+    _analyse_folder_with_cache(args.language, args.target_dir, entrypoint,
+                               out_dir)
 
-    if 'c' in args.language:
+    if args.language in C_CPP_LANGUAGES:
         language = 'c-cpp'
     else:
         language = args.language
@@ -53,6 +53,14 @@ LANGUAGE_EXTENSIONS = {
     LANGUAGES.GO: ['.go', '.cgo'],
 }
 
+# Build files whose presence at the root of a project identifies its
+# language without having to scan the source tree.
+LANGUAGE_MANIFEST_FILES = {
+    LANGUAGES.JAVA: ['pom.xml', 'build.gradle', 'build.gradle.kts'],
+    LANGUAGES.RUST: ['Cargo.toml'],
+    LANGUAGES.GO: ['go.mod'],
+}
+
 # Holds data about all functions in javascript, to ease loading of static
 # website.
 ALL_FUNCTION_JS = "all_functions.js"
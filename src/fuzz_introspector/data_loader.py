@@ -16,7 +16,9 @@
 import os
 import json
 import logging
-import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from typing import (
     Any,
@@ -97,6 +99,23 @@ def _load_profile(data_file: str, language: str, manager, semaphore=None):
         semaphore.release()
 
 
+def _get_max_workers(default: int) -> int:
+    """Returns the number of workers to load profiles with, which can be
+    overridden by the FI_MAX_WORKERS environment variable."""
+    max_workers_env = os.environ.get('FI_MAX_WORKERS', '')
+    if not max_workers_env:
+        return default
+    try:
+        max_workers = int(max_workers_env)
+    except ValueError:
+        max_workers = 0
+    if max_workers < 1:
+        logger.warning('Invalid FI_MAX_WORKERS value "%s", using %d workers',
+                       max_workers_env, default)
+        return default
+    return max_workers
+
+
 def load_all_debug_files(target_folder: str):
     """Loads all .debug_info files"""
     debug_info_files = utils.get_all_files_in_tree_with_regex(
@@ -150,18 +169,34 @@ def load_all_profiles(
 
     logger.info(" - found %d profiles to load", len(data_files))
     if parallelise:
-        manager = multiprocessing.Manager()
-        semaphore = multiprocessing.Semaphore(semaphore_count)
-        return_dict = manager.dict()
-        jobs = []
-        for data_file in data_files:
-            p = multiprocessing.Process(target=_load_profile,
-                                        args=(data_file, language, return_dict,
-                                              semaphore))
-            jobs.append(p)
-            p.start()
-        for proc in jobs:
-            proc.join()
+        # Parsing the data files is CPU bound, so use processes to avoid
+        # being limited by the GIL. The number of workers can be overridden
+        # as each worker holds a full profile in memory.
+        max_workers = _get_max_workers(semaphore_count)
+        return_dict: Dict[str, fuzzer_profile.FuzzerProfile] = dict()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(data_file,
+                        executor.submit(read_fuzzer_data_file_to_profile,
+                                        data_file, language))
+                       for data_file in data_files]
+            for data_file, future in futures:
+                try:
+                    profile = future.result()
+                except BrokenProcessPool:
+                    # A worker died, most likely killed for exhausting
+                    # memory. All pending profiles are lost with it, so do
+                    # not continue with a partial set of profiles.
+                    logger.error(
+                        'A profile loading worker terminated abruptly. '
+                        'Consider lowering FI_MAX_WORKERS.')
+                    raise
+                except Exception as e:
+                    logger.error('Failed to load profile %s: %s', data_file, e)
+                    continue
+                if profile is not None:
+                    return_dict[data_file] = profile
+                else:
+                    logger.error('profile is none')
 
         for v in return_dict.values():
             profiles.append(v)
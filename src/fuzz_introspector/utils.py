@@ -21,7 +21,6 @@ import os
 import re
 import shutil
 import yaml
-import pathlib
 
 from bs4 import BeautifulSoup
 
@@ -77,6 +76,28 @@ def get_all_files_in_tree_with_regex(basedir: str,
     return data_files
 
 
+def data_file_read_json(filename: str) -> Optional[dict[Any, Any]]:
+    """
+    Reads a file as a json file. This is used to load the json variant of
+    data otherwise stored as yaml, as json is much faster to parse.
+    """
+    if filename == '':
+        return None
+    if not os.path.isfile(filename):
+        return None
+
+    try:
+        with open(filename, 'r') as stream:
+            data_dict = json.load(stream)
+    except (OSError, ValueError) as e:
+        logger.info('Failed loading JSON: %s', str(e))
+        return None
+
+    if not isinstance(data_dict, dict):
+        return None
+    return data_dict
+
+
 def data_file_read_yaml(filename: str) -> Optional[dict[Any, Any]]:
     """
     Reads a file as a yaml file. This is used to load data
@@ -195,13 +216,14 @@ def scan_executables_for_fuzz_introspector_logs(
     if not os.path.isdir(exec_dir):
         return []
 
-    # Find all executables
+    # Find all executables. os.scandir provides the file type of each entry
+    # from the directory listing, saving a stat call per entry.
     executable_files = []
-    for f in os.listdir(exec_dir):
-        full_path = os.path.join(exec_dir, f)
-        if os.access(full_path, os.X_OK) and os.path.isfile(full_path):
-            logger.info('File: %s is executable', full_path)
-            executable_files.append(full_path)
+    with os.scandir(exec_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and os.access(entry.path, os.X_OK):
+                logger.info('File: %s is executable', entry.path)
+                executable_files.append(entry.path)
 
     # Filter all executables containing "fuzzerLogFile" string
     executable_to_fuzz_reports = []
@@ -583,20 +605,50 @@ def locate_rust_fuzz_item(funcname: str, item_list: list[str]) -> str:
 def detect_language(directory) -> str:
     """Given a folder finds the likely programming language of the project"""
 
+    # Check for build files identifying a single language first, as this
+    # avoids walking the whole tree.
+    manifest_languages = set()
+    # pylint: disable-next=no-member
+    for language, manifests in constants.LANGUAGE_MANIFEST_FILES.items():
+        for manifest in manifests:
+            if os.path.isfile(os.path.join(directory, manifest)):
+                manifest_languages.add(language)
+    if len(manifest_languages) == 1:
+        return manifest_languages.pop()
+
     paths_to_avoid = [
         '/src/aflplusplus', '/src/honggfuzz', '/src/libfuzzer', '/src/fuzztest'
     ]
 
+    extension_languages: dict[str, list[str]] = {}
+    # pylint: disable-next=no-member
+    for language, extensions in constants.LANGUAGE_EXTENSIONS.items():
+        for extension in extensions:
+            extension_languages.setdefault(extension, []).append(language)
+
+    # Walk the tree top-down with os.scandir, which gives the file type of
+    # each entry without an extra stat call.
     language_counts: dict[str, int] = {}
-    for dirpath, _, filenames in os.walk(directory):
-        if any([x for x in paths_to_avoid if dirpath.startswith(x)]):
+    dirs_to_visit = [directory]
+    while dirs_to_visit:
+        dirpath = dirs_to_visit.pop()
+        if any(dirpath.startswith(x) for x in paths_to_avoid):
+            continue
+        subdirs = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            subdirs.append(entry.path)
+                        continue
+                    suffix = os.path.splitext(entry.name)[1]
+                    for language in extension_languages.get(suffix, []):
+                        curr_count = language_counts.get(language, 0)
+                        language_counts[language] = curr_count + 1
+        except OSError:
             continue
-        for filename in filenames:
-            # pylint: disable-next=no-member
-            for language, extensions in constants.LANGUAGE_EXTENSIONS.items():
-                if pathlib.Path(filename).suffix in extensions:
-                    curr_count = language_counts.get(language, 0)
-                    language_counts[language] = curr_count + 1
+        dirs_to_visit.extend(reversed(subdirs))
 
     max_lang = ''
     max_count = -1
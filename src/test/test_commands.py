@@ -0,0 +1,329 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit testing script for helpers in commands.py"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import commands  # noqa: E402
+from fuzz_introspector.frontends import oss_fuzz  # noqa: E402
+
+
+@pytest.fixture
+def frontend_runs(monkeypatch):
+    """Fixture recording the calls made to the frontend"""
+    runs = []
+    analyse_folder = oss_fuzz.analyse_folder
+
+    def counting_analyse_folder(*args, **kwargs):
+        runs.append(kwargs)
+        return analyse_folder(*args, **kwargs)
+
+    monkeypatch.setattr(oss_fuzz, 'analyse_folder', counting_analyse_folder)
+    monkeypatch.delenv('OUT', raising=False)
+    return runs
+
+
+@pytest.fixture
+def cpp_project(tmp_path):
+    """Fixture for a minimal C++ project with a single harness"""
+    target_dir = tmp_path / 'project'
+    target_dir.mkdir()
+    (target_dir / 'fuzzer.cpp').write_text(
+        'int LLVMFuzzerTestOneInput(const char *data, int size) {\n'
+        '  return 0;\n'
+        '}\n')
+    return target_dir
+
+
+def test_analyse_folder_with_cache(tmp_path, monkeypatch, frontend_runs,
+                                   cpp_project):
+    target_dir = cpp_project
+    monkeypatch.setenv('FI_FRONTEND_CACHE_DIR', str(tmp_path / 'cache'))
+
+    out_dirs = [tmp_path / 'out1', tmp_path / 'out2']
+    for out_dir in out_dirs:
+        out_dir.mkdir()
+        commands._analyse_folder_with_cache('c++', str(target_dir),
+                                            'LLVMFuzzerTestOneInput',
+                                            str(out_dir))
+
+    # The second run must be served from the cache.
+    assert len(frontend_runs) == 1
+    assert sorted(os.listdir(out_dirs[0])) == sorted(os.listdir(out_dirs[1]))
+    assert 'fuzzerLogFile-fuzzer.data' in os.listdir(out_dirs[1])
+    assert (commands.FRONTEND_CACHE_COMPLETE_MARKER
+            not in os.listdir(out_dirs[1]))
+
+    # Changing the project invalidates the cache.
+    (target_dir / 'fuzzer.cpp').write_text(
+        'int LLVMFuzzerTestOneInput(const char *data, int size) {\n'
+        '  return -1;\n'
+        '}\n')
+    commands._analyse_folder_with_cache('c++', str(target_dir),
+                                        'LLVMFuzzerTestOneInput',
+                                        str(out_dirs[0]))
+    assert len(frontend_runs) == 2
+
+    # So do new textcov reports, which the frontend pairs harnesses with.
+    oss_fuzz_out = tmp_path / 'oss-fuzz-out'
+    (oss_fuzz_out / 'textcov_reports').mkdir(parents=True)
+    monkeypatch.setenv('OUT', str(oss_fuzz_out))
+    commands._analyse_folder_with_cache('c++', str(target_dir),
+                                        'LLVMFuzzerTestOneInput',
+                                        str(out_dirs[0]))
+    assert len(frontend_runs) == 3
+    (oss_fuzz_out / 'textcov_reports' / 'fuzzer.covreport').touch()
+    commands._analyse_folder_with_cache('c++', str(target_dir),
+                                        'LLVMFuzzerTestOneInput',
+                                        str(out_dirs[0]))
+    assert len(frontend_runs) == 4
+
+
+def test_analyse_folder_with_cache_out_dir_in_target(tmp_path, monkeypatch,
+                                                     frontend_runs,
+                                                     cpp_project):
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setenv('FI_FRONTEND_CACHE_DIR', str(cache_dir))
+
+    # The output of earlier runs must not change the key of later runs.
+    out_dir = cpp_project / 'out'
+    out_dir.mkdir()
+    for _ in range(3):
+        commands._analyse_folder_with_cache('c++', str(cpp_project),
+                                            'LLVMFuzzerTestOneInput',
+                                            str(out_dir))
+    assert len(frontend_runs) == 1
+    assert len(os.listdir(cache_dir)) == 1
+
+    # An output directory holding the target cannot be told apart from it.
+    for _ in range(2):
+        commands._analyse_folder_with_cache('c++', str(cpp_project),
+                                            'LLVMFuzzerTestOneInput',
+                                            str(cpp_project))
+    assert len(frontend_runs) == 3
+
+
+def test_analyse_folder_with_cache_frontend_error(tmp_path, monkeypatch,
+                                                  cpp_project):
+    cache_dir = tmp_path / 'cache'
+    monkeypatch.setenv('FI_FRONTEND_CACHE_DIR', str(cache_dir))
+    monkeypatch.delenv('OUT', raising=False)
+
+    def failing_analyse_folder(*args, **kwargs):
+        raise RuntimeError('frontend failed')
+
+    monkeypatch.setattr(oss_fuzz, 'analyse_folder', failing_analyse_folder)
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    with pytest.raises(RuntimeError):
+        commands._analyse_folder_with_cache('c++', str(cpp_project),
+                                            'LLVMFuzzerTestOneInput',
+                                            str(out_dir))
+    assert os.listdir(cache_dir) == []
+
+
+def test_analyse_folder_without_cache(tmp_path, monkeypatch, frontend_runs,
+                                      cpp_project):
+    monkeypatch.delenv('FI_FRONTEND_CACHE_DIR', raising=False)
+    monkeypatch.setenv('HOME', str(tmp_path))
+
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    for _ in range(2):
+        commands._analyse_folder_with_cache('c++', str(cpp_project),
+                                            'LLVMFuzzerTestOneInput',
+                                            str(out_dir))
+    assert len(frontend_runs) == 2
+    assert 'fuzzerLogFile-fuzzer.data' in os.listdir(out_dir)
+    assert not os.path.exists(tmp_path / '.cache')
+
+
+def test_copy_files_with_tar(tmp_path):
+    src_dir = tmp_path / 'src'
+    (src_dir / 'include').mkdir(parents=True)
+    (src_dir / 'main.c').write_text('int main() { return 0; }\n')
+    (src_dir / 'include' / 'main.h').write_text('#define MAIN 1\n')
+    dst_root = tmp_path / 'dst'
+    dst_root.mkdir()
+
+    files = [str(src_dir / 'main.c'), str(src_dir / 'include' / 'main.h')]
+    assert commands._copy_files_with_tar(files, str(dst_root))
+    for f in files:
+        with open(str(dst_root) + f) as copied, open(f) as original:
+            assert copied.read() == original.read()
+
+    assert not commands._copy_files_with_tar([str(src_dir / 'missing.c')],
+                                             str(dst_root))
+
+
+def test_copy_files_with_tar_symlink(tmp_path):
+    src_dir = tmp_path / 'src'
+    (src_dir / 'sub').mkdir(parents=True)
+    (src_dir / 'real.c').write_text('int real() { return 0; }\n')
+    (src_dir / 'sub' / 'link.c').symlink_to('../real.c')
+    dst_root = tmp_path / 'dst'
+    dst_root.mkdir()
+
+    # Symlinked sources are copied as files, like shutil.copy does.
+    link = str(src_dir / 'sub' / 'link.c')
+    assert commands._copy_files_with_tar([link], str(dst_root))
+    copied = str(dst_root) + link
+    assert not os.path.islink(copied)
+    with open(copied) as f:
+        assert f.read() == 'int real() { return 0; }\n'
+
+
+def test_copy_files_with_tar_non_utf8_name(tmp_path):
+    src_dir = tmp_path / 'src'
+    src_dir.mkdir()
+    # File names that are not valid UTF-8 are surrogate escaped.
+    name = os.fsdecode(b'\xff.c')
+    with open(os.fsencode(src_dir) + b'/\xff.c', 'w') as f:
+        f.write('int main() { return 0; }\n')
+    dst_root = tmp_path / 'dst'
+    dst_root.mkdir()
+
+    src = os.path.join(str(src_dir), name)
+    assert commands._copy_files_with_tar([src], str(dst_root))
+    with open(str(dst_root) + src) as f:
+        assert f.read() == 'int main() { return 0; }\n'
+
+
+def test_fast_clone_short_copy(tmp_path, monkeypatch):
+    src = tmp_path / 'src.c'
+    src.write_text('int main() { return 0; }\n')
+    dst = tmp_path / 'dst.c'
+
+    def fail_link(src, dst):
+        raise OSError('cross-device link')
+
+    monkeypatch.setattr(os, 'link', fail_link)
+    monkeypatch.setattr(os, 'copy_file_range', lambda *args: 0)
+
+    # A copy that stops early must not count as cloned.
+    assert not commands._fast_clone(str(src), str(dst))
+    assert not dst.exists()
+
+
+def test_find_correlation_file(tmp_path):
+    json_file = tmp_path / 'exe_to_fuzz_introspector_logs.json'
+    yaml_file = tmp_path / 'exe_to_fuzz_introspector_logs.yaml'
+    assert commands._find_correlation_file(str(tmp_path)) == ''
+
+    yaml_file.write_text('pairings: []\n')
+    assert commands._find_correlation_file(str(tmp_path)) == str(yaml_file)
+
+    json_file.write_text('{"pairings": []}')
+    os.utime(yaml_file, (1000, 1000))
+    os.utime(json_file, (2000, 2000))
+    assert commands._find_correlation_file(str(tmp_path)) == str(json_file)
+
+    # A json file left over from before the yaml file was rewritten is stale.
+    os.utime(yaml_file, (3000, 3000))
+    assert commands._find_correlation_file(str(tmp_path)) == str(yaml_file)
+
+
+@pytest.fixture
+def light_analysis_inputs(tmp_path, monkeypatch):
+    """Fixture replacing the /src scanning of the light analysis with a
+    small source tree"""
+    src_dir = tmp_path / 'src'
+    (src_dir / 'project' / 'tests').mkdir(parents=True)
+    source_file = src_dir / 'project' / 'lib.c'
+    source_file.write_text('int lib() { return 0; }\n')
+    test_file = src_dir / 'project' / 'tests' / 'lib_test.c'
+    test_file.write_text('int main() { return lib(); }\n')
+    monkeypatch.setenv('SRC', str(src_dir))
+
+    test_out_dirs = []
+
+    def extract_tests_from_directories(directories, language, out_dir):
+        test_out_dirs.append(out_dir)
+        return {str(test_file)}
+
+    monkeypatch.setattr(commands.analysis, 'extract_tests_from_directories',
+                        extract_tests_from_directories)
+    monkeypatch.setattr(commands.analysis,
+                        'light_correlate_source_to_executable',
+                        lambda language: [])
+    monkeypatch.setattr(commands.analysis, 'extract_all_sources',
+                        lambda language: {str(source_file)})
+    return src_dir, test_out_dirs
+
+
+def test_light_analysis(light_analysis_inputs):
+    src_dir, test_out_dirs = light_analysis_inputs
+    source_file = str(src_dir / 'project' / 'lib.c')
+    light_dir = src_dir / 'inspector' / 'light'
+
+    exit_code, return_values = commands.light_analysis(
+        argparse.Namespace(language='c'))
+
+    assert exit_code == 0
+    assert test_out_dirs == [str(src_dir / 'inspector')]
+    assert return_values['all-files'] == {source_file}
+    with open(light_dir / 'all_files.json') as f:
+        assert json.load(f) == [source_file]
+    with open(light_dir / 'all_tests.json') as f:
+        assert json.load(f) == [str(src_dir / 'project' / 'tests' /
+                                    'lib_test.c')]
+    with open(light_dir / 'all_pairs.json') as f:
+        assert json.load(f) == []
+    with open(str(light_dir / 'source_files') + source_file) as f:
+        assert f.read() == 'int lib() { return 0; }\n'
+
+
+def test_light_analysis_without_dumping_files(light_analysis_inputs):
+    src_dir, test_out_dirs = light_analysis_inputs
+
+    exit_code, return_values = commands.light_analysis(
+        argparse.Namespace(language='c'), dump_files=False)
+
+    assert exit_code == 0
+    assert return_values == {
+        'test-files': {str(src_dir / 'project' / 'tests' / 'lib_test.c')},
+        'all-pairs': [],
+        'all-files': {str(src_dir / 'project' / 'lib.c')}
+    }
+    # Neither the test files nor any other output may be saved.
+    assert test_out_dirs == ['']
+    assert not os.path.exists(src_dir / 'inspector')
+
+
+@pytest.mark.parametrize(
+    'items',
+    [
+        set(),
+        {'/src/project/lib.c'},
+        [('/src/fuzzer.c', '/out/fuzzer'), ('/src/ü.c', '/out/ü')],
+        [{'executable_path': '/out/fuzzer', 'fuzzer_log_file': 'log'}],
+        # File names that are not valid UTF-8 are surrogate escaped.
+        {'/src/project/\udcff.c'},
+    ]
+)
+def test_dump_iter(monkeypatch, items):
+    """The JSON must not depend on whether orjson is installed"""
+    for json_encoder in [commands.orjson, None]:
+        monkeypatch.setattr(commands, 'orjson', json_encoder)
+        fp = io.BytesIO()
+        commands._dump_iter(items, fp)
+        assert json.loads(fp.getvalue()) == json.loads(
+            json.dumps(list(items)))
@@ -0,0 +1,60 @@
+# Copyright 2025 Fuzz Introspector Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit testing script for data_loader.py"""
+
+import os
+import sys
+import pytest
+
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)) + "/../")
+
+from fuzz_introspector import data_loader  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    ('env_value', 'expected'),
+    [
+        (None, 6),
+        ('', 6),
+        ('2', 2),
+        ('0', 6),
+        ('-1', 6),
+        ('many', 6),
+    ]
+)
+def test_get_max_workers(monkeypatch, env_value, expected):
+    if env_value is None:
+        monkeypatch.delenv('FI_MAX_WORKERS', raising=False)
+    else:
+        monkeypatch.setenv('FI_MAX_WORKERS', env_value)
+    assert data_loader._get_max_workers(6) == expected
+
+
+def _dying_worker(cfg_file, language):
+    """Simulates a worker killed by the OOM killer"""
+    os._exit(1)
+
+
+def test_load_all_profiles_worker_died(tmp_path, monkeypatch):
+    for idx in range(3):
+        (tmp_path / f'fuzzerLogFile-{idx}.data').write_text('Call tree\n')
+
+    monkeypatch.setattr(data_loader, 'read_fuzzer_data_file_to_profile',
+                        _dying_worker)
+
+    # Losing a worker must not silently produce a partial set of profiles.
+    with pytest.raises(BrokenProcessPool):
+        data_loader.load_all_profiles(str(tmp_path), 'c-cpp', True)
@@ -14,16 +14,25 @@
 """Unit testing script for the CPP frontend"""
 
 import os
+import pytest
+
 from fuzz_introspector.frontends import oss_fuzz  # noqa: E402
 
 
-def test_tree_sitter_cpp_sample1():
+@pytest.fixture(scope='session')
+def cpp_sample1_project():
+    """Fixture running the frontend once on test-project-1"""
     project, _ = oss_fuzz.analyse_folder(
         'c++',
         'src/test/data/source-code/cpp/test-project-1',
         'LLVMFuzzerTestOneInput',
         dump_output=False,
     )
+    return project
+
+
+def test_tree_sitter_cpp_sample1(cpp_sample1_project):
+    project = cpp_sample1_project
 
     # Project check
     assert len(project.get_source_codes_with_harnesses()) == 1
@@ -242,3 +242,62 @@ def test_resolve_coverage_link(
     if (temp_file is not None):
         # Remove temp html_status.json file
         os.remove('temp_html_status.json')
+
+
+def test_data_file_read_json(tmp_path):
+    correlation_file = tmp_path / 'exe_to_fuzz_introspector_logs.json'
+    correlation_file.write_text(
+        '{"pairings": [{"executable_path": "/out/fuzzer", '
+        '"fuzzer_log_file": "fuzzerLogFile-0-abc"}]}')
+    assert utils.data_file_read_json(str(correlation_file)) == {
+        'pairings': [{
+            'executable_path': '/out/fuzzer',
+            'fuzzer_log_file': 'fuzzerLogFile-0-abc'
+        }]
+    }
+
+    correlation_file.write_text('[]')
+    assert utils.data_file_read_json(str(correlation_file)) is None
+    assert utils.data_file_read_json('') is None
+    assert utils.data_file_read_json(str(tmp_path / 'missing.json')) is None
+
+
+@pytest.mark.parametrize(
+    ('files', 'expected'),
+    [
+        (['Cargo.toml', 'src/lib.c', 'src/util.c'], 'rust'),
+        (['go.mod', 'main.c'], 'go'),
+        (['pom.xml', 'src/main/java/A.java'], 'jvm'),
+        (['Cargo.toml', 'go.mod', 'a.go', 'b.go', 'c.rs'], 'go'),
+        (['src/a.java', 'src/b.java', 'include/c.h'], 'jvm'),
+        (['src/a.cpp', 'src/b.cc', 'src/c.c'], 'c++'),
+        ([], ''),
+    ]
+)
+def test_detect_language(tmp_path, files: list[str], expected: str):
+    for filename in files:
+        path = tmp_path / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    assert utils.detect_language(str(tmp_path)) == expected
+
+
+def test_scan_executables_for_fuzz_introspector_logs(tmp_path):
+    fuzzer = tmp_path / 'fuzzer'
+    fuzzer.write_bytes(b'\x7fELF\x00\x00fuzzerLogFile-0-XYZabc123\x00')
+    fuzzer.chmod(0o755)
+    not_executable = tmp_path / 'not_executable'
+    not_executable.write_bytes(b'fuzzerLogFile-1-XYZabc123')
+    not_executable.chmod(0o644)
+    no_log = tmp_path / 'no_log'
+    no_log.write_bytes(b'\x7fELF\x00\x00')
+    no_log.chmod(0o755)
+    (tmp_path / 'subdir').mkdir()
+
+    assert utils.scan_executables_for_fuzz_introspector_logs(
+        str(tmp_path)) == [{
+            'executable_path': str(fuzzer),
+            'fuzzer_log_file': 'fuzzerLogFile-0-XYZabc123'
+        }]
+    assert utils.scan_executables_for_fuzz_introspector_logs(
+        str(tmp_path / 'missing')) == []